@@ -6,59 +6,254 @@ No user tracking, no document storage - just pure AI analysis
 
 import os
 import sys
-import tempfile
-import shutil
+import time
 import asyncio
+import hashlib
+import traceback
 from datetime import datetime
 from typing import List
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+# Use uvloop for every embedder of this module (uvicorn, TestClient, scripts),
+# not just the __main__ uvicorn.run path. io_uring-based loops aren't packaged
+# for this stack, so uvloop is the fastest loop we can actually ship.
+if sys.platform == "linux":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        print("⚡ uvloop event loop policy installed")
+    except ImportError:
+        pass  # Fall back to the default asyncio loop
+
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Depends
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-import aiofiles
+from fastapi.middleware.gzip import GZipMiddleware
+import orjson
+from cachetools import LRUCache, TTLCache
 
 # Import only essential modules
 try:
     from gemini_service import GeminiLegalAnalyzer
     from config import settings
-    from text_extractor import extract_text_fast
+    from text_extractor import extract_text_fast_bytes
     from job_manager import job_manager, JobStatus
     print("✅ All modules imported successfully")
 except ImportError as e:
     print(f"❌ Import error: {e}")
     raise
 
-# Initialize Gemini AI analyzer
-gemini_analyzer = None
+# Limit concurrent Gemini calls so parallel files don't hit API rate limits
+SEM = asyncio.Semaphore(int(os.getenv("CONCURRENCY", "3")))
+
+def _is_pdf(name: str) -> bool:
+    """Case-insensitive .pdf suffix check without lowercasing the whole filename"""
+    return name[-4:].lower() == ".pdf"
+
+async def _validate_pdf_uploads(files: List[UploadFile]):
+    """
+    Validate all uploads in a single pass: filename, declared size, and
+    %PDF- magic bytes. Fails fast before any file is fully read or written.
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+
+    for file in files:
+        # Add null check for filename
+        if not file.filename:
+            raise HTTPException(status_code=400, detail="File has no filename")
+        if not _is_pdf(file.filename):
+            raise HTTPException(
+                status_code=400,
+                detail=f"File {file.filename} is not a PDF"
+            )
+        # Reject oversized uploads before reading any bytes
+        if file.size and file.size > settings.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File {file.filename} exceeds maximum size of {settings.MAX_FILE_SIZE} bytes"
+            )
+        # Peek the magic bytes so bogus content is rejected before disk/extract work
+        header = await file.read(5)
+        await file.seek(0)
+        if header != b"%PDF-":
+            raise HTTPException(
+                status_code=400,
+                detail=f"File {file.filename} is not a valid PDF"
+            )
+
+def get_analyzer(request: Request) -> GeminiLegalAnalyzer:
+    """
+    Dependency that fetches the Gemini analyzer from app.state.
+    Raises 503 in one place instead of every handler rechecking a global.
+    """
+    analyzer = request.app.state.analyzer
+    if not analyzer:
+        raise HTTPException(
+            status_code=503,
+            detail="AI analysis service unavailable - Gemini API not configured"
+        )
+    return analyzer
+
+def truncate(s: str, n: int) -> str:
+    """Truncate a string to n chars, appending an ellipsis only if something was cut"""
+    if not s:
+        return ""
+    return s if len(s) <= n else s[:n] + "..."
+
+# Content-hash caches so re-uploading the same PDF skips OCR and Gemini entirely
+TEXT_CACHE = LRUCache(maxsize=128)      # sha256(pdf bytes) -> extracted text
+ANALYSIS_CACHE = LRUCache(maxsize=128)  # sha256(extracted text) -> clause analyses
+
+# Whole-response cache for /analyze-legal-document, keyed by the sorted
+# content hashes of the uploaded batch so identical uploads (in any order)
+# hit the same entry. Managed in the handler - fastapi-cache2's decorator
+# breaks POST endpoints and never caches non-GET requests anyway.
+RESPONSE_CACHE = TTLCache(maxsize=64, ttl=3600)
+
+def _batch_key(uploads: List[tuple]) -> str:
+    """Cache key for a batch of (filename, bytes, digest) upload tuples"""
+    return "|".join(sorted(digest for _, _, digest in uploads))
+
+def _is_error_analysis(clause_analyses) -> bool:
+    """True when the analyzer returned its error-sentinel clause list"""
+    return bool(clause_analyses) and bool(clause_analyses[0].get("error"))
+
+async def _read_upload(file: UploadFile) -> tuple:
+    """
+    Read an upload into memory and return (filename, bytes, sha256 hex digest).
+    The extractor consumes bytes directly, so nothing is written to disk.
+    """
+    content = await file.read()
+    return file.filename, content, hashlib.sha256(content).hexdigest()
+
+async def _extract_one_file(data: bytes, filename: str, max_text_chars: int = 0,
+                            content_hash: str = None):
+    """
+    Extract text from in-memory PDF bytes with content-hash caching.
+    Returns (filename, extracted_text) or (filename, None) if text is insufficient.
+    """
+    extracted_text = TEXT_CACHE.get(content_hash) if content_hash else None
+    if extracted_text is not None:
+        print(f"⚡ Text cache hit for {filename}")
+    else:
+        loop = asyncio.get_running_loop()
+        extracted_text = await loop.run_in_executor(app.state.pdf_pool, extract_text_fast_bytes, data)
+        if content_hash and extracted_text:
+            TEXT_CACHE[content_hash] = extracted_text
+
+    if not extracted_text or len(extracted_text.strip()) < 50:
+        return filename, None  # Skip files with insufficient text
+
+    # Limit text size to reduce processing time (async path only)
+    if max_text_chars and len(extracted_text) > max_text_chars:
+        extracted_text = extracted_text[:max_text_chars] + "..."
+        print(f"📝 Text truncated for faster processing")
+
+    return filename, extracted_text
+
+async def _process_one_file(data: bytes, filename: str, analyzer: GeminiLegalAnalyzer,
+                            max_text_chars: int = 0, content_hash: str = None):
+    """
+    Process a single PDF held in memory: extract text and analyze with Gemini.
+    Blocking calls run in threads so files can be processed concurrently.
+    Both stages are cached by content hash so repeat uploads are near-instant.
+    Returns (filename, clause_analyses) or (filename, None) if text is insufficient.
+    """
+    filename, extracted_text = await _extract_one_file(data, filename,
+                                                       max_text_chars, content_hash)
+    if extracted_text is None:
+        return filename, None
+
+    text_key = hashlib.sha256(extracted_text.encode("utf-8")).hexdigest()
+    clause_analyses = ANALYSIS_CACHE.get(text_key)
+    if clause_analyses is not None:
+        print(f"⚡ Analysis cache hit for {filename}")
+        return filename, clause_analyses
+
+    async with SEM:
+        clause_analyses = await asyncio.to_thread(
+            analyzer.analyze_legal_document,
+            extracted_text,
+            "Legal Document"
+        )
+
+    # Never cache the analyzer's error sentinel - a transient Gemini
+    # failure must not poison this document for the process lifetime
+    if not _is_error_analysis(clause_analyses):
+        ANALYSIS_CACHE[text_key] = clause_analyses
+    return filename, clause_analyses
+
+async def _job_worker(queue: asyncio.Queue):
+    """
+    Consume queued analysis jobs. A fixed number of these run, so a burst
+    of async requests queues up instead of spawning unbounded pipelines.
+    """
+    while True:
+        job_id, file_blobs, analyzer = await queue.get()
+        try:
+            await process_legal_documents_background(job_id, file_blobs, analyzer)
+        except Exception as e:
+            print(f"❌ Job worker error for {job_id}: {str(e)}")
+        finally:
+            queue.task_done()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize services on startup and cleanup on shutdown"""
-    global gemini_analyzer
     try:
         print("🚀 Starting Legal AI Analysis API...")
         print(f"📊 Python version: {sys.version}")
         print(f"🔧 Port: {os.getenv('PORT', '8000')}")
         print(f"🗝️ Gemini API Key configured: {bool(settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != 'your-gemini-api-key-here')}")
-        
+
+        # Size the default executor so asyncio.to_thread can run several
+        # extract/Gemini calls at once without starving the event loop
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=8))
+
+        # Process pool for CPU-bound PDF text extraction - sidesteps the GIL
+        # so multiple PDFs can be parsed on separate cores
+        app.state.pdf_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+        # Bounded job queue + fixed worker pool gives the async endpoint
+        # back-pressure: full queue -> 503 instead of a RAM/rate-limit blowup
+        app.state.job_queue = asyncio.Queue(maxsize=50)
+        app.state.job_workers = [
+            asyncio.create_task(_job_worker(app.state.job_queue))
+            for _ in range(int(os.getenv("JOB_WORKERS", "2")))
+        ]
+
+        # Static /health fields computed once - load balancers probe this
+        # endpoint every few seconds, so don't rebuild them per request
+        app.state.health_static = {
+            "port": os.getenv('PORT', '8000'),
+            "python_version": sys.version.split()[0],
+            "gemini_configured": bool(settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != 'your-gemini-api-key-here')
+        }
+
+        # Analyzer lives on app.state; handlers get it via Depends(get_analyzer)
         if settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != "your-gemini-api-key-here":
             try:
-                gemini_analyzer = GeminiLegalAnalyzer(settings.GEMINI_API_KEY)
+                app.state.analyzer = GeminiLegalAnalyzer(settings.GEMINI_API_KEY)
                 print("✅ Gemini AI analyzer initialized successfully")
             except Exception as e:
                 print(f"❌ Failed to initialize Gemini AI: {str(e)}")
-                gemini_analyzer = None
+                app.state.analyzer = None
         else:
             print("⚠️ Gemini API key not configured")
-            gemini_analyzer = None
+            app.state.analyzer = None
         
         print("✅ Legal AI Analysis API startup complete")
         yield
         print("🔄 Shutting down Legal AI Analysis API...")
+        for worker in app.state.job_workers:
+            worker.cancel()
+        app.state.pdf_pool.shutdown(wait=False, cancel_futures=True)
     except Exception as e:
         print(f"💥 Critical startup error: {str(e)}")
         print(f"💥 Error type: {type(e).__name__}")
-        import traceback
         traceback.print_exc()
         raise
 
@@ -67,7 +262,8 @@ app = FastAPI(
     title="Legal AI Analysis API",
     description="Ultra-simplified API for AI-powered legal document analysis with Gemini",
     version="3.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # 3-10x faster JSON serialization than stdlib
 )
 
 # Add CORS middleware
@@ -79,6 +275,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large analysis responses on the wire (JSON compresses 5-10x);
+# small responses like /health skip compression entirely
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 @app.get("/health")
 async def health_check():
     """
@@ -89,13 +289,9 @@ async def health_check():
             "status": "healthy",
             "message": "Legal AI Analysis API is operational",
             "timestamp": datetime.now().isoformat(),
-            "ai_enabled": gemini_analyzer is not None,
+            "ai_enabled": getattr(app.state, "analyzer", None) is not None,
             "version": "3.0.0",
-            "environment": {
-                "port": os.getenv('PORT', '8000'),
-                "python_version": sys.version.split()[0],
-                "gemini_configured": bool(settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != 'your-gemini-api-key-here')
-            }
+            "environment": app.state.health_static
         }
     except Exception as e:
         return {
@@ -105,36 +301,19 @@ async def health_check():
         }
 
 @app.post("/analyze-legal-document")
-async def analyze_legal_document(files: List[UploadFile] = File(...)):
+async def analyze_legal_document(files: List[UploadFile] = File(...),
+                                 analyzer: GeminiLegalAnalyzer = Depends(get_analyzer)):
     """
     Analyze legal documents with AI and return results immediately.
     No user tracking, no storage - just pure AI analysis.
     
     Returns format: {"clause": "text", "risk": "High/Medium/Low", "laws": "laws", "summary": "summary"}
     """
-    import time
     start_time = time.time()
     
-    # Validate inputs
-    if not files:
-        raise HTTPException(status_code=400, detail="No files uploaded")
-    
-    for file in files:
-        # Add null check for filename
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="File has no filename")
-        if not file.filename.lower().endswith('.pdf'):
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File {file.filename} is not a PDF"
-            )
-    
-    if not gemini_analyzer:
-        raise HTTPException(
-            status_code=503, 
-            detail="AI analysis service unavailable - Gemini API not configured"
-        )
-    
+    # Validate inputs (single pass, fails before any full read)
+    await _validate_pdf_uploads(files)
+
     # Limit number of files to prevent timeout
     if len(files) > 3:
         raise HTTPException(
@@ -142,70 +321,90 @@ async def analyze_legal_document(files: List[UploadFile] = File(...)):
             detail="Maximum 3 files allowed per request to prevent timeout"
         )
     
-    temp_dir = None
-    
     try:
-        # Create temporary directory
-        temp_dir = tempfile.mkdtemp(prefix=f"legal_analysis_")
-        
-        # Process each file
+        # Read uploads into memory - bytes go straight to the extractor, no temp files
+        uploads = [await _read_upload(file) for file in files]
+
+        # Replay a cached response for a previously analyzed batch (1h TTL)
+        batch_key = _batch_key(uploads)
+        cached_response = RESPONSE_CACHE.get(batch_key)
+        if cached_response is not None:
+            print("⚡ Response cache hit for upload batch")
+            return cached_response
+
+        # Extract all files concurrently - latency becomes max(file_times) not sum
+        tasks = [_extract_one_file(data, name, content_hash=key)
+                 for name, data, key in uploads]
+        extracted = await asyncio.gather(*tasks, return_exceptions=True)
+
+        documents = []
+        extraction_failed = False
+        for result in extracted:
+            if isinstance(result, Exception):
+                print(f"Error processing file: {str(result)}")
+                extraction_failed = True
+                continue
+            filename, text = result
+            if text is None:
+                continue  # Skipped - insufficient text
+            documents.append((filename, text))
+
+        # Resolve cached analyses; only uncached documents go to Gemini
+        analyses_by_file = {}
+        text_keys = {}
+        to_analyze = []
+        for filename, text in documents:
+            text_key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            text_keys[filename] = text_key
+            cached = ANALYSIS_CACHE.get(text_key)
+            if cached is not None:
+                print(f"⚡ Analysis cache hit for {filename}")
+                analyses_by_file[filename] = cached
+            else:
+                to_analyze.append((filename, text))
+
+        # Single batched Gemini round-trip for all remaining documents
+        if to_analyze:
+            async with SEM:
+                batch_results = await asyncio.to_thread(
+                    analyzer.analyze_documents_batch,
+                    to_analyze
+                )
+            for filename, clause_analyses in batch_results.items():
+                # Never cache the analyzer's error sentinel - a transient
+                # Gemini failure must not poison this document's entry
+                if not _is_error_analysis(clause_analyses):
+                    ANALYSIS_CACHE[text_keys[filename]] = clause_analyses
+                analyses_by_file[filename] = clause_analyses
+
         all_legal_analyses = []
         processed_files = []
-        
-        for file in files:
-            file_path = os.path.join(temp_dir, file.filename)
-            
-            # Save uploaded file
-            content = await file.read()
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
-            
-            # Extract text from PDF
-            try:
-                extracted_text = extract_text_fast(file_path)
-                
-                if not extracted_text or len(extracted_text.strip()) < 50:
-                    continue  # Skip files with insufficient text
-                
-                # Analyze with Gemini AI
-                clause_analyses = gemini_analyzer.analyze_legal_document(
-                    extracted_text, 
-                    "Legal Document"
-                )
-                
-                # Limit and optimize response size
-                max_clauses = 10  # Limit number of clauses
-                max_text_length = 500  # Limit text length per clause
-                
-                # Convert to requested format with size limits
-                for i, analysis in enumerate(clause_analyses[:max_clauses]):
-                    # Truncate long text fields
-                    clause_text = analysis.get("clause", "")[:max_text_length]
-                    if len(analysis.get("clause", "")) > max_text_length:
-                        clause_text += "..."
-                    
-                    summary_text = analysis.get("summary", "")[:300]  # Shorter summary
-                    if len(analysis.get("summary", "")) > 300:
-                        summary_text += "..."
-                    
-                    laws_text = analysis.get("laws", "")[:200]  # Shorter laws
-                    if len(analysis.get("laws", "")) > 200:
-                        laws_text += "..."
-                    
-                    legal_item = {
-                        "clause_id": i + 1,
-                        "clause": clause_text,
-                        "risk": analysis.get("risk", "Medium"),
-                        "laws": laws_text,
-                        "summary": summary_text
-                    }
-                    all_legal_analyses.append(legal_item)
-                
-                processed_files.append(file.filename)
-                
-            except Exception as e:
-                print(f"Error processing {file.filename}: {str(e)}")
+
+        for filename, _ in documents:
+            clause_analyses = analyses_by_file.get(filename)
+            if clause_analyses is None:
                 continue
+
+            # Limit and optimize response size
+            max_clauses = 10  # Limit number of clauses
+            max_text_length = 500  # Limit text length per clause
+
+            # Convert to requested format with size limits
+            for i, analysis in enumerate(clause_analyses[:max_clauses]):
+                # Bind each field once - avoids repeated dict lookups per clause
+                raw_clause = analysis.get("clause") or ""
+                raw_laws = analysis.get("laws") or ""
+                raw_summary = analysis.get("summary") or ""
+                legal_item = {
+                    "clause_id": i + 1,
+                    "clause": truncate(raw_clause, max_text_length),
+                    "risk": analysis.get("risk", "Medium"),
+                    "laws": truncate(raw_laws, 200),
+                    "summary": truncate(raw_summary, 300)
+                }
+                all_legal_analyses.append(legal_item)
+
+            processed_files.append(filename)
         
         # Return immediate results (no storage) with optimized size
         response_data = {
@@ -223,78 +422,60 @@ async def analyze_legal_document(files: List[UploadFile] = File(...)):
             }
         }
         
-        # Log response size for monitoring
-        import json
-        response_size = len(json.dumps(response_data))
+        # Same rule for the whole-response cache: don't replay failures,
+        # whether a Gemini error sentinel or a crashed extraction task
+        if not extraction_failed and not any(
+                _is_error_analysis(analyses) for analyses in analyses_by_file.values()):
+            RESPONSE_CACHE[batch_key] = response_data
+
+        # Size log still uses orjson; ORJSONResponse encodes the returned dict
+        response_size = len(orjson.dumps(response_data))
         processing_time = time.time() - start_time
         print(f"📊 Response size: {response_size} bytes ({response_size/1024:.1f} KB)")
         print(f"⏱️ Processing time: {processing_time:.2f} seconds")
-        
+
         # Add timeout check
         if processing_time > 25:  # Render has 30s timeout
             print("⚠️ Warning: Response approaching timeout limit")
-        
+
         return response_data
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
-        
-    finally:
-        # Cleanup temporary files
-        if temp_dir and os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
 
-@app.post("/analyze-legal-document-async")
-async def analyze_legal_document_async(files: List[UploadFile] = File(...)):
+async def analyze_legal_document_async(files: List[UploadFile] = File(...),
+                                       analyzer: GeminiLegalAnalyzer = Depends(get_analyzer)):
     """
     Start legal document analysis asynchronously.
     Returns job_id immediately, processing happens in background.
     """
-    
-    # Validate inputs
-    if not files:
-        raise HTTPException(status_code=400, detail="No files uploaded")
-    
-    for file in files:
-        if not file.filename:
-            raise HTTPException(status_code=400, detail="File has no filename")
-        if not file.filename.lower().endswith('.pdf'):
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File {file.filename} is not a PDF"
-            )
-    
-    if not gemini_analyzer:
-        raise HTTPException(
-            status_code=503, 
-            detail="AI analysis service unavailable - Gemini API not configured"
-        )
-    
+
+    # Validate inputs (single pass, fails before any full read)
+    await _validate_pdf_uploads(files)
+
     # Create job
     job_id = job_manager.create_job("legal_analysis")
-    
-    # Save files temporarily and store file info
-    temp_dir = tempfile.mkdtemp(prefix=f"legal_analysis_{job_id}_")
-    file_paths = []
-    
+
     try:
-        for file in files:
-            file_path = os.path.join(temp_dir, file.filename)
-            content = await file.read()
-            with open(file_path, 'wb') as f:
-                f.write(content)
-            file_paths.append(file_path)
-        
+        # Read files into memory - the background task consumes bytes directly,
+        # so no temp directory has to outlive this request
+        file_blobs = [await _read_upload(file) for file in files]
+
         # Update job with file info
         job_manager.update_job_progress(job_id, 0, len(files))
-        
-        # Start background processing
-        asyncio.create_task(process_legal_documents_background(
-            job_id, file_paths, temp_dir
-        ))
-        
+
+        # Queue for the fixed worker pool - full queue means we're saturated
+        try:
+            app.state.job_queue.put_nowait((job_id, file_blobs, analyzer))
+        except asyncio.QueueFull:
+            job_manager.set_job_error(job_id, "Server busy - job queue full")
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy - job queue full, try again later"
+            )
+
         return {
             "job_id": job_id,
             "status": "accepted",
@@ -303,15 +484,13 @@ async def analyze_legal_document_async(files: List[UploadFile] = File(...)):
             "estimated_time": f"{len(files) * 30-60} seconds",
             "check_status_url": f"/job-status/{job_id}"
         }
-        
+
+    except HTTPException:
+        raise
     except Exception as e:
-        # Cleanup on error
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
         job_manager.set_job_error(job_id, str(e))
         raise HTTPException(status_code=500, detail=f"Failed to start analysis: {str(e)}")
 
-@app.get("/job-status/{job_id}")
 async def get_job_status(job_id: str):
     """
     Get the status and results of a legal document analysis job.
@@ -322,7 +501,7 @@ async def get_job_status(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     
     # Return status without result if still processing
-    if job["status"] in [JobStatus.PENDING, JobStatus.PROCESSING]:
+    if job["status"] in (JobStatus.PENDING, JobStatus.PROCESSING):
         return {
             "job_id": job_id,
             "status": job["status"],
@@ -356,7 +535,6 @@ async def get_job_status(job_id: str):
             "error": job["error"]
         }
 
-@app.get("/jobs")
 async def list_jobs():
     """
     Get summary of all jobs (for debugging/monitoring)
@@ -366,85 +544,87 @@ async def list_jobs():
         "message": "Job summary retrieved successfully"
     }
 
-async def process_legal_documents_background(job_id: str, file_paths: List[str], temp_dir: str):
+# Async job endpoints are feature-flagged - deployments that only need the
+# sync path skip their route/schema objects entirely
+if settings.ENABLE_ASYNC_JOBS:
+    app.post("/analyze-legal-document-async")(analyze_legal_document_async)
+    app.get("/job-status/{job_id}")(get_job_status)
+    app.get("/jobs")(list_jobs)
+
+async def process_legal_documents_background(job_id: str, file_blobs: List[tuple],
+                                             analyzer: GeminiLegalAnalyzer):
     """
-    Background task to process legal documents with timeout protection
+    Background task to process legal documents with timeout protection.
+    file_blobs is a list of (filename, pdf_bytes, content_hash) tuples.
     """
-    import time
     start_time = time.time()
     max_processing_time = 25  # Stay well under 30s limit
     
     try:
         job_manager.update_job_status(job_id, JobStatus.PROCESSING)
-        
+
+        completed_count = 0
+
+        async def _run_one(filename: str, data: bytes, content_hash: str):
+            """Process one file and update job progress on completion"""
+            nonlocal completed_count
+            print(f"🔄 Processing file: {filename}")
+
+            file_start = time.time()
+            name, analyses = await _process_one_file(data, filename, analyzer,
+                                                     max_text_chars=5000,
+                                                     content_hash=content_hash)
+
+            completed_count += 1
+            job_manager.update_job_progress(job_id, completed_count, len(file_blobs))
+            print(f"⏱️ File processed in {time.time() - file_start:.2f}s")
+            return name, analyses
+
+        # Run all files concurrently, but stop waiting when timeout approaches
+        tasks = [asyncio.create_task(_run_one(name, data, key)) for name, data, key in file_blobs]
+        done, pending = await asyncio.wait(tasks, timeout=max_processing_time)
+
+        if pending:
+            print(f"⏰ Timeout approaching, cancelling {len(pending)} unfinished files")
+            for task in pending:
+                task.cancel()
+
         all_legal_analyses = []
         processed_files = []
-        
-        for i, file_path in enumerate(file_paths):
-            # Check if we're approaching timeout
-            elapsed_time = time.time() - start_time
-            if elapsed_time > max_processing_time:
-                print(f"⏰ Timeout approaching, stopping after {i} files")
-                break
-                
+
+        for task in tasks:
+            if task not in done:
+                continue
             try:
-                print(f"🔄 Processing file {i+1}/{len(file_paths)}: {os.path.basename(file_path)}")
-                
-                # Extract text from PDF (with timeout)
-                file_start = time.time()
-                extracted_text = extract_text_fast(file_path)
-                
-                if not extracted_text or len(extracted_text.strip()) < 50:
-                    print(f"⚠️ Skipping file with insufficient text: {os.path.basename(file_path)}")
-                    continue
-                
-                # Limit text size to reduce processing time
-                if len(extracted_text) > 5000:  # Limit to 5000 chars
-                    extracted_text = extracted_text[:5000] + "..."
-                    print(f"📝 Text truncated for faster processing")
-                
-                # Analyze with Gemini AI (with reduced complexity)
-                clause_analyses = gemini_analyzer.analyze_legal_document(
-                    extracted_text, 
-                    "Legal Document"
-                )
-                
-                # Severely limit response to ensure speed
-                max_clauses = 3  # Reduced from 10
-                max_text_length = 200  # Reduced from 500
-                
-                for j, analysis in enumerate(clause_analyses[:max_clauses]):
-                    clause_text = analysis.get("clause", "")[:max_text_length]
-                    if len(analysis.get("clause", "")) > max_text_length:
-                        clause_text += "..."
-                    
-                    summary_text = analysis.get("summary", "")[:150]  # Reduced
-                    if len(analysis.get("summary", "")) > 150:
-                        summary_text += "..."
-                    
-                    laws_text = analysis.get("laws", "")[:100]  # Reduced
-                    if len(analysis.get("laws", "")) > 100:
-                        laws_text += "..."
-                    
-                    legal_item = {
-                        "file": os.path.basename(file_path),
-                        "clause_id": j + 1,
-                        "clause": clause_text,
-                        "risk": analysis.get("risk", "Medium"),
-                        "laws": laws_text,
-                        "summary": summary_text
-                    }
-                    all_legal_analyses.append(legal_item)
-                
-                processed_files.append(os.path.basename(file_path))
-                job_manager.update_job_progress(job_id, i + 1, len(file_paths))
-                
-                file_time = time.time() - file_start
-                print(f"⏱️ File processed in {file_time:.2f}s")
-                
+                filename, clause_analyses = task.result()
             except Exception as e:
-                print(f"❌ Error processing {file_path}: {str(e)}")
+                print(f"❌ Error processing file: {str(e)}")
+                continue
+
+            if clause_analyses is None:
+                print(f"⚠️ Skipping file with insufficient text: {filename}")
                 continue
+
+            # Severely limit response to ensure speed
+            max_clauses = 3  # Reduced from 10
+            max_text_length = 200  # Reduced from 500
+
+            for j, analysis in enumerate(clause_analyses[:max_clauses]):
+                # Bind each field once - avoids repeated dict lookups per clause
+                raw_clause = analysis.get("clause") or ""
+                raw_laws = analysis.get("laws") or ""
+                raw_summary = analysis.get("summary") or ""
+                legal_item = {
+                    "file": filename,
+                    "clause_id": j + 1,
+                    "clause": truncate(raw_clause, max_text_length),
+                    "risk": analysis.get("risk", "Medium"),
+                    "laws": truncate(raw_laws, 100),
+                    "summary": truncate(raw_summary, 150)
+                }
+                all_legal_analyses.append(legal_item)
+
+            processed_files.append(filename)
         
         # Prepare final result (optimized)
         total_time = time.time() - start_time
@@ -472,131 +652,106 @@ async def process_legal_documents_background(job_id: str, file_paths: List[str],
         error_msg = f"Background processing failed: {str(e)}"
         print(f"❌ Job {job_id} failed: {error_msg}")
         job_manager.set_job_error(job_id, error_msg)
-        
-    finally:
-        # Cleanup temporary files
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
 
 @app.post("/analyze-legal-document-simple")
-async def analyze_legal_document_simple(files: List[UploadFile] = File(...)):
+async def analyze_legal_document_simple(files: List[UploadFile] = File(...),
+                                        analyzer: GeminiLegalAnalyzer = Depends(get_analyzer)):
     """
     Ultra-simplified analysis for cloud deployment reliability.
     Returns minimal but fast analysis results.
     """
-    import time
     start_time = time.time()
     
-    # Validate inputs
-    if not files:
-        raise HTTPException(status_code=400, detail="No files uploaded")
-    
+    # Validate inputs (single pass, fails before any full read)
+    await _validate_pdf_uploads(files)
+
     # Limit to 1 file for reliability
     if len(files) > 1:
         raise HTTPException(status_code=400, detail="Simple endpoint accepts only 1 file at a time")
-    
+
     file = files[0]
-    if not file.filename or not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Must be a PDF file")
-    
-    if not gemini_analyzer:
-        raise HTTPException(status_code=503, detail="AI service unavailable")
-    
-    temp_dir = None
-    
-    try:
-        # Create temporary directory
-        temp_dir = tempfile.mkdtemp(prefix="simple_analysis_")
-        file_path = os.path.join(temp_dir, file.filename)
-        
-        # Save uploaded file
-        content = await file.read()
-        with open(file_path, 'wb') as f:
-            f.write(content)
-        
-        # Extract text (with limits)
-        extracted_text = extract_text_fast(file_path)
-        
-        if not extracted_text or len(extracted_text.strip()) < 20:
-            raise HTTPException(status_code=400, detail="Could not extract sufficient text from PDF")
+
+    # Read the upload into memory - the extractor consumes bytes directly
+    content = await file.read()
+
+    # Extract text (with limits) - in the process pool so /health stays responsive
+    loop = asyncio.get_running_loop()
+    extracted_text = await loop.run_in_executor(app.state.pdf_pool, extract_text_fast_bytes, content)
+
+    if not extracted_text or len(extracted_text.strip()) < 20:
+        raise HTTPException(status_code=400, detail="Could not extract sufficient text from PDF")
         
-        # Limit text size aggressively
-        if len(extracted_text) > 2000:
-            extracted_text = extracted_text[:2000] + "..."
+    # Limit text size aggressively
+    if len(extracted_text) > 2000:
+        extracted_text = extracted_text[:2000] + "..."
         
-        # Quick analysis with Gemini
-        try:
-            clause_analyses = gemini_analyzer.analyze_legal_document(
-                extracted_text, 
-                "Legal Document"
-            )
-            
-            # Return only the first clause for speed
-            if clause_analyses:
-                analysis = clause_analyses[0]
-                result = {
-                    "status": "completed",
-                    "file": file.filename,
-                    "processing_time": round(time.time() - start_time, 2),
-                    "analysis": {
-                        "clause": analysis.get("clause", "")[:300],
-                        "risk": analysis.get("risk", "Medium"),
-                        "laws": analysis.get("laws", "")[:150],
-                        "summary": analysis.get("summary", "")[:200]
-                    },
-                    "note": "Simplified analysis - use async endpoint for full analysis"
-                }
-            else:
-                result = {
-                    "status": "completed",
-                    "file": file.filename,
-                    "processing_time": round(time.time() - start_time, 2),
-                    "analysis": {
-                        "clause": "Document analyzed",
-                        "risk": "Medium",
-                        "laws": "General legal principles apply",
-                        "summary": "Basic document analysis completed"
-                    },
-                    "note": "Fallback analysis - no specific clauses identified"
-                }
-            
-            return result
-            
-        except Exception as ai_error:
-            # Fallback response if AI fails
-            return {
+    # Quick analysis with Gemini
+    try:
+        clause_analyses = await asyncio.to_thread(
+            analyzer.analyze_legal_document,
+            extracted_text,
+            "Legal Document"
+        )
+
+        # Return only the first clause for speed
+        if clause_analyses:
+            analysis = clause_analyses[0]
+            result = {
+                "status": "completed",
+                "file": file.filename,
+                "processing_time": round(time.time() - start_time, 2),
+                "analysis": {
+                    "clause": analysis.get("clause", "")[:300],
+                    "risk": analysis.get("risk", "Medium"),
+                    "laws": analysis.get("laws", "")[:150],
+                    "summary": analysis.get("summary", "")[:200]
+                },
+                "note": "Simplified analysis - use async endpoint for full analysis"
+            }
+        else:
+            result = {
                 "status": "completed",
                 "file": file.filename,
                 "processing_time": round(time.time() - start_time, 2),
                 "analysis": {
-                    "clause": "Document processed",
+                    "clause": "Document analyzed",
                     "risk": "Medium",
-                    "laws": "Standard legal review recommended",
-                    "summary": f"Document contains {len(extracted_text)} characters of text"
+                    "laws": "General legal principles apply",
+                    "summary": "Basic document analysis completed"
                 },
-                "note": f"AI analysis failed: {str(ai_error)[:100]}"
+                "note": "Fallback analysis - no specific clauses identified"
             }
             
-    finally:
-        # Cleanup
-        if temp_dir and os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        return result
+            
+    except Exception as ai_error:
+        # Fallback response if AI fails
+        return {
+            "status": "completed",
+            "file": file.filename,
+            "processing_time": round(time.time() - start_time, 2),
+            "analysis": {
+                "clause": "Document processed",
+                "risk": "Medium",
+                "laws": "Standard legal review recommended",
+                "summary": f"Document contains {len(extracted_text)} characters of text"
+            },
+            "note": f"AI analysis failed: {str(ai_error)[:100]}"
+        }
 
 @app.post("/analyze-legal-document-quick")
-async def analyze_legal_document_quick(files: List[UploadFile] = File(...)):
+async def analyze_legal_document_quick(files: List[UploadFile] = File(...),
+                                       analyzer: GeminiLegalAnalyzer = Depends(get_analyzer)):
     """
     Quick analysis endpoint - returns minimal response for testing
     """
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded")
-    
-    if not gemini_analyzer:
-        raise HTTPException(status_code=503, detail="AI service unavailable")
-    
+
     # Quick validation and response
     processed_files = []
     for file in files:
-        if file.filename and file.filename.lower().endswith('.pdf'):
+        if file.filename and _is_pdf(file.filename):
             processed_files.append(file.filename)
     
     # Minimal response for testing
@@ -614,7 +769,7 @@ async def root():
         "message": "Legal AI Analysis API",
         "version": "4.1.0",
         "status": "operational",
-        "ai_enabled": gemini_analyzer is not None,
+        "ai_enabled": getattr(app.state, "analyzer", None) is not None,
         "endpoints": [
             "/health - Health check",
             "/analyze-legal-document-simple - Fast, reliable analysis (RECOMMENDED for cloud)",
@@ -639,9 +794,14 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
+    # uvloop + httptools give 2-4x throughput over the default asyncio loop;
+    # WEB_CONCURRENCY scales worker processes to the available cores
     uvicorn.run(
         "api:app",
         host="0.0.0.0",
-        port=8000,
-        reload=True
+        port=int(os.getenv("PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        reload=False
     )
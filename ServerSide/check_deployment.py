@@ -5,59 +5,87 @@ Simple startup script to test and debug the API before deployment
 
 import sys
 import os
+import logging
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+# Lazy %s formatting skips the format step entirely when the level is off
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(message)s")
+logger = logging.getLogger(__name__)
+
+# Pre-built status markers - the emoji are encoded once, not per line
+_OK = "✅"
+_FAIL = "❌"
+
+def _check_module(module):
+    """Return (module, available) using find_spec - no module execution"""
+    # find_spec locates the module without executing it, so heavy
+    # imports like cv2/fitz don't add seconds to the startup probe
+    try:
+        return module, importlib.util.find_spec(module) is not None
+    except ModuleNotFoundError:
+        # Dotted name whose parent package is missing (e.g. google.*)
+        return module, False
 
 def check_dependencies():
     """Check if all required modules are available"""
     required_modules = [
         'fastapi',
         'uvicorn',
-        'aiofiles',
         'pytesseract',
         'cv2',
         'fitz',  # PyMuPDF
         'google.generativeai',
-        'dotenv'
+        'dotenv',
+        'orjson',
+        'cachetools'
     ]
-    
+    # Not probed: uvloop/httptools (api.py falls back to the default loop)
+    # and redis (only needed when JOB_STORE=redis)
+
+    # Probe in parallel so the check takes max lookup time, not the sum
+    with ThreadPoolExecutor(max_workers=len(required_modules)) as executor:
+        results = list(executor.map(_check_module, required_modules))
+
     missing = []
-    for module in required_modules:
-        try:
-            __import__(module)
-            print(f"✅ {module}")
-        except ImportError:
-            print(f"❌ {module}")
+    for module, found in results:
+        if found:
+            logger.info("%s %s", _OK, module)
+        else:
+            logger.info("%s %s", _FAIL, module)
             missing.append(module)
-    
+
     if missing:
-        print(f"\n❌ Missing modules: {', '.join(missing)}")
+        logger.info("\n%s Missing modules: %s", _FAIL, ', '.join(missing))
         return False
     else:
-        print("\n✅ All dependencies available")
+        logger.info("\n%s All dependencies available", _OK)
         return True
 
 def check_environment():
     """Check environment variables"""
-    print("\n🔧 Environment Variables:")
+    logger.info("\n🔧 Environment Variables:")
     port = os.getenv('PORT', '8000')
     gemini_key = os.getenv('GEMINI_API_KEY', '')
-    
-    print(f"   PORT: {port}")
-    print(f"   GEMINI_API_KEY: {'✅ Set' if gemini_key and gemini_key != 'your-gemini-api-key-here' else '❌ Not set'}")
-    
-    return bool(gemini_key and gemini_key != 'your-gemini-api-key-here')
+
+    key_set = bool(gemini_key and gemini_key != 'your-gemini-api-key-here')
+    logger.info("   PORT: %s", port)
+    logger.info("   GEMINI_API_KEY: %s", f"{_OK} Set" if key_set else f"{_FAIL} Not set")
+
+    return key_set
 
 def main():
-    print("🧪 Pre-deployment check for Legal AI Analysis API\n")
-    
+    logger.info("🧪 Pre-deployment check for Legal AI Analysis API\n")
+
     deps_ok = check_dependencies()
     env_ok = check_environment()
-    
+
     if deps_ok and env_ok:
-        print("\n✅ All checks passed! Ready for deployment.")
+        logger.info("\n%s All checks passed! Ready for deployment.", _OK)
         return 0
     else:
-        print("\n❌ Some checks failed. Fix issues before deployment.")
+        logger.info("\n%s Some checks failed. Fix issues before deployment.", _FAIL)
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
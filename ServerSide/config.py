@@ -28,6 +28,7 @@ class Settings:
     
     # Processing Configuration
     MAX_CONCURRENT_JOBS: int = int(os.getenv("MAX_CONCURRENT_JOBS", "5"))
+    ENABLE_ASYNC_JOBS: bool = os.getenv("ENABLE_ASYNC_JOBS", "true").lower() == "true"
     JOB_TIMEOUT: int = int(os.getenv("JOB_TIMEOUT", "300"))  # 5 minutes
     CLEANUP_TEMP_FILES: bool = os.getenv("CLEANUP_TEMP_FILES", "true").lower() == "true"
     
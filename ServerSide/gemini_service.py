@@ -6,7 +6,7 @@ Provides detailed clause analysis, risk assessment, and legal summaries
 import google.generativeai as genai
 import json
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 from datetime import datetime
 
@@ -14,17 +14,25 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# genai.configure tears down and rebuilds the SDK's underlying gRPC channel
+# (and its TLS session); track the configured key so repeated analyzer
+# construction reuses the existing channel instead of paying a new handshake
+_configured_api_key: Optional[str] = None
+
 class GeminiLegalAnalyzer:
     def __init__(self, api_key: str):
         """
         Initialize Gemini AI service for legal analysis
-        
+
         Args:
             api_key: Google Gemini API key
         """
+        global _configured_api_key
         self.api_key = api_key
-        genai.configure(api_key=api_key)
-        
+        if _configured_api_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
+
         # Configure the model for legal analysis
         self.model = genai.GenerativeModel(
             model_name="gemini-1.5-flash",  # Using latest Gemini model
@@ -81,6 +89,139 @@ class GeminiLegalAnalyzer:
             logger.error(f"Error in legal document analysis: {str(e)}")
             return self._create_error_response(str(e))
     
+    def analyze_documents_batch(self, documents: List[Tuple[str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Analyze several documents in a single Gemini request.
+        Collapses N network round-trips into 1 and sends the instructions only once.
+
+        Args:
+            documents: List of (document_name, document_text) pairs
+
+        Returns:
+            Dict mapping document_name to its list of analyzed clauses
+        """
+        if not documents:
+            return {}
+
+        # A single document doesn't need the batch framing
+        if len(documents) == 1:
+            name, text = documents[0]
+            return {name: self.analyze_legal_document(text, "Legal Document")}
+
+        try:
+            prompt = self._create_batch_prompt(documents)
+            response = self.model.generate_content(prompt)
+            results = self._parse_batch_response(response.text, documents)
+            if results is not None:
+                return results
+        except Exception as e:
+            logger.error(f"Error in batch document analysis: {str(e)}")
+
+        # Fall back to one request per document if the batch response is unusable
+        logger.info("Batch analysis failed, falling back to per-document analysis")
+        return {
+            name: self.analyze_legal_document(text, "Legal Document")
+            for name, text in documents
+        }
+
+    def _create_batch_prompt(self, documents: List[Tuple[str, str]]) -> str:
+        """Create a single prompt covering multiple delimited documents"""
+
+        doc_sections = "\n".join(
+            f"<<<DOC id={i}>>>\n{text}\n<<<END>>>"
+            for i, (_, text) in enumerate(documents)
+        )
+
+        prompt = f"""
+You are an expert legal analyst specializing in contract review and risk assessment.
+Analyze EACH of the following {len(documents)} documents independently. Documents are
+delimited by <<<DOC id=N>>> ... <<<END>>> markers.
+
+DOCUMENTS:
+{doc_sections}
+
+ANALYSIS REQUIREMENTS (apply to every document):
+1. Identify ALL important clauses in the document
+2. For each clause, provide risk assessment (High/Medium/Low)
+3. Explain the legal implications and original law basis
+4. Provide detailed summary with potential impact
+
+OUTPUT FORMAT (JSON):
+Return a single JSON object with one entry per document:
+
+{{
+  "results": [
+    {{
+      "doc_id": 0,
+      "clauses": [
+        {{
+          "clause": "Full text of the identified clause",
+          "risk": "High|Medium|Low",
+          "laws": "Relevant legal principles, statutes, or common law that applies to this clause",
+          "summary": "Detailed analysis explaining: 1) What this clause means in plain language, 2) Potential risks or benefits, 3) Impact on parties involved, 4) Recommendations"
+        }}
+      ]
+    }}
+  ]
+}}
+
+RISK ASSESSMENT CRITERIA:
+- High Risk: Could result in significant financial loss, legal liability, or operational disruption
+- Medium Risk: Moderate impact on business operations or legal exposure
+- Low Risk: Minor implications with limited impact
+
+IMPORTANT: Return ONLY the JSON object, no additional text or formatting.
+"""
+        return prompt
+
+    def _parse_batch_response(self, response_text: str,
+                              documents: List[Tuple[str, str]]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Parse the batch response; returns None if it can't be mapped back to documents"""
+        try:
+            text = re.sub(r'```json\s*', '', response_text)
+            text = re.sub(r'```\s*', '', text).strip()
+
+            # Find the JSON object
+            start_idx = text.find('{')
+            end_idx = text.rfind('}') + 1
+            if start_idx == -1 or end_idx == 0:
+                return None
+
+            batch_data = json.loads(text[start_idx:end_idx])
+            entries = batch_data.get("results", [])
+
+            results: Dict[str, List[Dict[str, Any]]] = {}
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    continue
+                doc_id = entry.get("doc_id")
+                if not isinstance(doc_id, int) or not (0 <= doc_id < len(documents)):
+                    continue
+
+                name = documents[doc_id][0]
+                structured_analysis = []
+                for item in entry.get("clauses", []):
+                    if isinstance(item, dict):
+                        structured_analysis.append({
+                            "clause": item.get("clause", ""),
+                            "risk": self._validate_risk_level(item.get("risk", "Medium")),
+                            "laws": item.get("laws", "General contract law principles"),
+                            "summary": item.get("summary", "Analysis not available"),
+                            "analyzed_at": datetime.now().isoformat(),
+                            "confidence": "high"
+                        })
+                results[name] = structured_analysis
+
+            # Require every document to be present, otherwise fall back
+            if len(results) != len(documents):
+                return None
+
+            return results
+
+        except (json.JSONDecodeError, TypeError) as e:
+            logger.error(f"Batch response parsing error: {str(e)}")
+            return None
+
     def _create_analysis_prompt(self, document_text: str, document_type: str) -> str:
         """Create a comprehensive prompt for legal analysis"""
         
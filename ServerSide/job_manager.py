@@ -3,8 +3,12 @@ Job management system for asynchronous legal document analysis
 """
 
 import asyncio
-import uuid
+import json
+import os
+import sqlite3
+import secrets
 import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Any, Optional
 from enum import Enum
@@ -15,71 +19,105 @@ class JobStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+# Built once - summaries start from a copy instead of re-iterating the enum
+_SUMMARY_TEMPLATE = {status.value: 0 for status in JobStatus}
+
+# Shared frozenset - O(1) membership and no per-check list allocation
+_TERMINAL_STATUSES = frozenset({JobStatus.COMPLETED, JobStatus.FAILED})
+
 class JobManager:
     def __init__(self):
-        # In-memory storage for jobs (in production, use Redis or database)
-        self.jobs: Dict[str, Dict[str, Any]] = {}
+        # Insertion-ordered storage: oldest jobs come first, so cleanup
+        # never has to sort by created_at
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.max_jobs = 100  # Reduced for cloud deployment
         self.job_timeout = 300  # 5 minutes max per job
+        # Incremental per-status counters make get_job_summary O(1)
+        self._status_counts = _SUMMARY_TEMPLATE.copy()
         
     def create_job(self, job_type: str = "legal_analysis") -> str:
         """Create a new job and return job ID"""
-        job_id = str(uuid.uuid4())[:8]  # Short UUID
+        job_id = secrets.token_hex(4)  # 8 hex chars, same 2^32 id space
         
         # Clean up old jobs if too many
         if len(self.jobs) >= self.max_jobs:
             self._cleanup_old_jobs()
         
+        # Timestamps are stored as time_ns ints; ISO strings are only
+        # built when a job is serialized for the API
         self.jobs[job_id] = {
             "job_id": job_id,
             "job_type": job_type,
             "status": JobStatus.PENDING,
-            "created_at": datetime.now().isoformat(),
-            "started_at": None,
-            "completed_at": None,
+            "created_at_ns": time.time_ns(),
+            "started_at_ns": None,
+            "completed_at_ns": None,
             "result": None,
             "error": None,
             "progress": 0,
             "total_files": 0,
             "processed_files": 0
         }
-        
+        self._status_counts[JobStatus.PENDING.value] += 1
+
         return job_id
     
+    @staticmethod
+    def _iso(ns: Optional[int]) -> Optional[str]:
+        """Format a time_ns timestamp as ISO, passing None through"""
+        return datetime.fromtimestamp(ns / 1e9).isoformat() if ns else None
+
+    def _serialize_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the API view of a job: ns timestamps become ISO strings"""
+        out = {key: value for key, value in job.items() if not key.endswith("_ns")}
+        out["created_at"] = self._iso(job["created_at_ns"])
+        out["started_at"] = self._iso(job["started_at_ns"])
+        out["completed_at"] = self._iso(job["completed_at_ns"])
+        return out
+
     def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get job details by ID with timeout check"""
         job = self.jobs.get(job_id)
-        if job:
-            # Check for timeout
-            if job["status"] == JobStatus.PROCESSING:
-                from datetime import datetime, timedelta
-                if job["started_at"]:
-                    started = datetime.fromisoformat(job["started_at"])
-                    if datetime.now() - started > timedelta(seconds=self.job_timeout):
-                        self.set_job_error(job_id, "Job timed out after 5 minutes")
-                        job["status"] = JobStatus.FAILED
-        return job
+        if job is None:
+            return None
+        # Timeout check is a single integer subtract on the stored ns value
+        if job["status"] == JobStatus.PROCESSING and job["started_at_ns"]:
+            if time.time_ns() - job["started_at_ns"] > self.job_timeout * 1_000_000_000:
+                self.set_job_error(job_id, "Job timed out after 5 minutes")
+        return self._serialize_job(job)
     
     def update_job_status(self, job_id: str, status: JobStatus, **kwargs):
         """Update job status and other fields"""
-        if job_id in self.jobs:
-            self.jobs[job_id]["status"] = status
-            
-            if status == JobStatus.PROCESSING and "started_at" not in self.jobs[job_id]:
-                self.jobs[job_id]["started_at"] = datetime.now().isoformat()
-            elif status in [JobStatus.COMPLETED, JobStatus.FAILED]:
-                self.jobs[job_id]["completed_at"] = datetime.now().isoformat()
-            
-            # Update any additional fields
-            for key, value in kwargs.items():
-                self.jobs[job_id][key] = value
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+
+        self._status_counts[job["status"]] -= 1
+        self._status_counts[status] += 1
+
+        # Collect all fields first, then apply them in one C-level update
+        updates = {"status": status}
+        if status == JobStatus.PROCESSING and job["started_at_ns"] is None:
+            updates["started_at_ns"] = time.time_ns()
+        elif status in _TERMINAL_STATUSES:
+            updates["completed_at_ns"] = time.time_ns()
+        updates.update(kwargs)
+
+        job.update(updates)
     
     def update_job_progress(self, job_id: str, processed: int, total: int):
         """Update job progress"""
-        if job_id in self.jobs:
-            self.jobs[job_id]["processed_files"] = processed
-            self.jobs[job_id]["total_files"] = total
-            self.jobs[job_id]["progress"] = int((processed / total) * 100) if total > 0 else 0
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        # Integer divide, and skip the writes when nothing actually changed
+        pct = (processed * 100) // total if total > 0 else 0
+        if (job["processed_files"] == processed and job["total_files"] == total
+                and job["progress"] == pct):
+            return
+        job["processed_files"] = processed
+        job["total_files"] = total
+        job["progress"] = pct
     
     def set_job_result(self, job_id: str, result: Any):
         """Set job result and mark as completed"""
@@ -91,24 +129,250 @@ class JobManager:
     
     def _cleanup_old_jobs(self):
         """Remove oldest completed/failed jobs"""
-        # Sort by creation time and remove oldest 20%
-        sorted_jobs = sorted(
-            [(job_id, job["created_at"]) for job_id, job in self.jobs.items()
-             if job["status"] in [JobStatus.COMPLETED, JobStatus.FAILED]],
-            key=lambda x: x[1]
-        )
-        
-        to_remove = len(sorted_jobs) // 5  # Remove 20%
-        for job_id, _ in sorted_jobs[:to_remove]:
+        # OrderedDict iterates oldest-first, so a single pass finds the
+        # finished jobs in age order - no ISO-string sort needed
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job["status"] in _TERMINAL_STATUSES]
+
+        to_remove = len(finished) // 5  # Remove oldest 20%
+        for job_id in finished[:to_remove]:
+            self._status_counts[self.jobs[job_id]["status"]] -= 1
             del self.jobs[job_id]
     
     def get_job_summary(self) -> Dict[str, int]:
         """Get summary of all jobs"""
-        summary = {status.value: 0 for status in JobStatus}
-        for job in self.jobs.values():
-            summary[job["status"]] += 1
+        if not self.jobs:
+            return {**_SUMMARY_TEMPLATE, "total": 0}
+        # Counters are maintained incrementally - no per-job scan
+        summary = self._status_counts.copy()
         summary["total"] = len(self.jobs)
         return summary
 
-# Global job manager instance
-job_manager = JobManager()
\ No newline at end of file
+class SQLiteJobManager(JobManager):
+    """
+    SQLite-backed job store with the same interface as JobManager.
+    With WAL mode the database can be shared by multiple uvicorn workers,
+    so a job created on worker A can be polled from worker B.
+    Enable with JOB_STORE=sqlite (path via JOB_DB_PATH, default jobs.db).
+    """
+
+    def __init__(self, db_path: str = None):
+        super().__init__()
+        self.db_path = db_path or os.getenv("JOB_DB_PATH", "jobs.db")
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, "
+                "created_at TEXT NOT NULL, "
+                "status TEXT NOT NULL, "
+                "data TEXT NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Short-lived connections keep this safe across worker processes
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _load(self, conn: sqlite3.Connection, job_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _store(self, conn: sqlite3.Connection, job: Dict[str, Any]):
+        conn.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, created_at, status, data) VALUES (?, ?, ?, ?)",
+            (job["job_id"], job["created_at"], str(job["status"]), json.dumps(job))
+        )
+
+    def create_job(self, job_type: str = "legal_analysis") -> str:
+        job_id = secrets.token_hex(4)
+
+        job = {
+            "job_id": job_id,
+            "job_type": job_type,
+            "status": JobStatus.PENDING.value,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "completed_at": None,
+            "result": None,
+            "error": None,
+            "progress": 0,
+            "total_files": 0,
+            "processed_files": 0
+        }
+
+        with self._connect() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            if count >= self.max_jobs:
+                # Remove oldest finished jobs (20%) - created_at sorts ISO dates correctly
+                conn.execute(
+                    "DELETE FROM jobs WHERE job_id IN ("
+                    "SELECT job_id FROM jobs WHERE status IN (?, ?) "
+                    "ORDER BY created_at LIMIT ?)",
+                    (JobStatus.COMPLETED.value, JobStatus.FAILED.value, count // 5)
+                )
+            self._store(conn, job)
+
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            job = self._load(conn, job_id)
+        if job and job["status"] == JobStatus.PROCESSING and job["started_at"]:
+            from datetime import timedelta
+            started = datetime.fromisoformat(job["started_at"])
+            if datetime.now() - started > timedelta(seconds=self.job_timeout):
+                self.set_job_error(job_id, "Job timed out after 5 minutes")
+                # Reload so this poll already sees the failed status, error
+                # message and completion time - not a stale pre-error copy
+                with self._connect() as conn:
+                    job = self._load(conn, job_id)
+        return job
+
+    def update_job_status(self, job_id: str, status: JobStatus, **kwargs):
+        with self._connect() as conn:
+            job = self._load(conn, job_id)
+            if not job:
+                return
+
+            job["status"] = status.value if isinstance(status, JobStatus) else status
+            if status == JobStatus.PROCESSING and not job["started_at"]:
+                job["started_at"] = datetime.now().isoformat()
+            elif status in _TERMINAL_STATUSES:
+                job["completed_at"] = datetime.now().isoformat()
+
+            for key, value in kwargs.items():
+                job[key] = value
+
+            self._store(conn, job)
+
+    def update_job_progress(self, job_id: str, processed: int, total: int):
+        with self._connect() as conn:
+            job = self._load(conn, job_id)
+            if not job:
+                return
+            job["processed_files"] = processed
+            job["total_files"] = total
+            job["progress"] = int((processed / total) * 100) if total > 0 else 0
+            self._store(conn, job)
+
+    def get_job_summary(self) -> Dict[str, int]:
+        summary = _SUMMARY_TEMPLATE.copy()
+        with self._connect() as conn:
+            for status, count in conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+                summary[status] = count
+            summary["total"] = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return summary
+
+class RedisJobManager(JobManager):
+    """
+    Redis-backed job store (hash per job) with the same interface.
+    Jobs are visible to every worker, and finished jobs get a TTL so
+    Redis evicts them itself - no O(N) cleanup scan on create.
+    Enable with JOB_STORE=redis (connection via REDIS_URL).
+    """
+
+    def __init__(self, url: str = None):
+        super().__init__()
+        import redis  # Imported lazily - only needed when JOB_STORE=redis
+        self.redis = redis.Redis.from_url(
+            url or os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            decode_responses=True
+        )
+        self.result_ttl = int(os.getenv("JOB_RESULT_TTL", "3600"))
+
+    def _key(self, job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def _store(self, job: Dict[str, Any]):
+        # Every field JSON-encoded so None/int/dict values round-trip
+        self.redis.hset(self._key(job["job_id"]),
+                        mapping={k: json.dumps(v) for k, v in job.items()})
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        return {k: json.loads(v) for k, v in raw.items()}
+
+    def create_job(self, job_type: str = "legal_analysis") -> str:
+        job_id = secrets.token_hex(4)
+
+        self._store({
+            "job_id": job_id,
+            "job_type": job_type,
+            "status": JobStatus.PENDING.value,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "completed_at": None,
+            "result": None,
+            "error": None,
+            "progress": 0,
+            "total_files": 0,
+            "processed_files": 0
+        })
+
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._load(job_id)
+        if job and job["status"] == JobStatus.PROCESSING and job["started_at"]:
+            from datetime import timedelta
+            started = datetime.fromisoformat(job["started_at"])
+            if datetime.now() - started > timedelta(seconds=self.job_timeout):
+                self.set_job_error(job_id, "Job timed out after 5 minutes")
+                # Reload so this poll already sees the failed status, error
+                # message and completion time - not a stale pre-error copy
+                job = self._load(job_id)
+        return job
+
+    def update_job_status(self, job_id: str, status: JobStatus, **kwargs):
+        job = self._load(job_id)
+        if not job:
+            return
+
+        job["status"] = status.value if isinstance(status, JobStatus) else status
+        if status == JobStatus.PROCESSING and not job["started_at"]:
+            job["started_at"] = datetime.now().isoformat()
+        elif status in _TERMINAL_STATUSES:
+            job["completed_at"] = datetime.now().isoformat()
+
+        for key, value in kwargs.items():
+            job[key] = value
+
+        self._store(job)
+
+        # Terminal jobs expire on their own - cleanup moves post-completion
+        if status in _TERMINAL_STATUSES:
+            self.redis.expire(self._key(job_id), self.result_ttl)
+
+    def update_job_progress(self, job_id: str, processed: int, total: int):
+        key = self._key(job_id)
+        if not self.redis.exists(key):
+            return
+        progress = int((processed / total) * 100) if total > 0 else 0
+        self.redis.hset(key, mapping={
+            "processed_files": json.dumps(processed),
+            "total_files": json.dumps(total),
+            "progress": json.dumps(progress)
+        })
+
+    def get_job_summary(self) -> Dict[str, int]:
+        summary = _SUMMARY_TEMPLATE.copy()
+        total = 0
+        for key in self.redis.scan_iter(match="job:*"):
+            status = self.redis.hget(key, "status")
+            if status:
+                summary[json.loads(status)] += 1
+                total += 1
+        summary["total"] = total
+        return summary
+
+# Global job manager instance - SQLite/Redis backends share jobs across workers
+_job_store = os.getenv("JOB_STORE", "memory").lower()
+if _job_store == "sqlite":
+    job_manager = SQLiteJobManager()
+elif _job_store == "redis":
+    job_manager = RedisJobManager()
+else:
+    job_manager = JobManager()
\ No newline at end of file
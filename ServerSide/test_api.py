@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 """
 Test script to verify API endpoints work correctly
+
+App startup runs once for the whole run (see gather_tests); individual
+tests receive the shared client instead of creating their own.
 """
 
 import asyncio
-import tempfile
-import os
-from fastapi.testclient import TestClient
+import httpx
 
 # Import the app
 try:
@@ -16,80 +17,80 @@ except Exception as e:
     print(f"❌ Failed to import app: {e}")
     exit(1)
 
-def test_health_endpoint():
+async def test_health_endpoint(client):
     """Test the health endpoint"""
-    with TestClient(app) as client:
-        try:
-            response = client.get("/health")
-            if response.status_code == 200:
-                data = response.json()
-                print("✅ Health endpoint working!")
-                print(f"   Status: {data.get('status')}")
-                print(f"   AI Enabled: {data.get('ai_enabled')}")
-                return True
-            else:
-                print(f"❌ Health endpoint failed: {response.status_code}")
-                return False
-        except Exception as e:
-            print(f"❌ Health endpoint error: {e}")
+    try:
+        response = await client.get("/health")
+        if response.status_code == 200:
+            data = response.json()
+            print("✅ Health endpoint working!")
+            print(f"   Status: {data.get('status')}")
+            print(f"   AI Enabled: {data.get('ai_enabled')}")
+            return True
+        else:
+            print(f"❌ Health endpoint failed: {response.status_code}")
             return False
+    except Exception as e:
+        print(f"❌ Health endpoint error: {e}")
+        return False
 
-def test_root_endpoint():
+async def test_root_endpoint(client):
     """Test the root endpoint"""
-    with TestClient(app) as client:
-        try:
-            response = client.get("/")
-            if response.status_code == 200:
-                data = response.json()
-                print("✅ Root endpoint working!")
-                print(f"   Message: {data.get('message')}")
-                return True
-            else:
-                print(f"❌ Root endpoint failed: {response.status_code}")
-                return False
-        except Exception as e:
-            print(f"❌ Root endpoint error: {e}")
+    try:
+        response = await client.get("/")
+        if response.status_code == 200:
+            data = response.json()
+            print("✅ Root endpoint working!")
+            print(f"   Message: {data.get('message')}")
+            return True
+        else:
+            print(f"❌ Root endpoint failed: {response.status_code}")
             return False
+    except Exception as e:
+        print(f"❌ Root endpoint error: {e}")
+        return False
 
-def test_invalid_file_upload():
+async def test_invalid_file_upload(client):
     """Test file upload validation"""
-    with TestClient(app) as client:
-        try:
-            # Test with non-PDF file
-            response = client.post(
-                "/analyze-legal-document",
-                files={"files": ("test.txt", b"This is not a PDF", "text/plain")}
-            )
-            if response.status_code == 400:
-                print("✅ File validation working!")
-                return True
-            else:
-                print(f"❌ File validation failed: {response.status_code}")
-                return False
-        except Exception as e:
-            print(f"❌ File validation error: {e}")
+    try:
+        # Test with non-PDF file
+        response = await client.post(
+            "/analyze-legal-document",
+            files={"files": ("test.txt", b"This is not a PDF", "text/plain")}
+        )
+        if response.status_code == 400:
+            print("✅ File validation working!")
+            return True
+        else:
+            print(f"❌ File validation failed: {response.status_code}")
             return False
+    except Exception as e:
+        print(f"❌ File validation error: {e}")
+        return False
+
+async def gather_tests():
+    """Run all tests concurrently against one app instance"""
+    # One lifespan + one client shared by every test, instead of a full
+    # startup/shutdown cycle per test
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                test_health_endpoint(client),
+                test_root_endpoint(client),
+                test_invalid_file_upload(client)
+            )
 
 def main():
     print("🧪 Testing Legal AI Analysis API endpoints\n")
-    
-    tests = [
-        ("Health Endpoint", test_health_endpoint),
-        ("Root Endpoint", test_root_endpoint),
-        ("File Validation", test_invalid_file_upload)
-    ]
-    
-    passed = 0
-    total = len(tests)
-    
-    for test_name, test_func in tests:
-        print(f"🔍 Testing {test_name}...")
-        if test_func():
-            passed += 1
-        print()
-    
-    print(f"📊 Results: {passed}/{total} tests passed")
-    
+
+    results = asyncio.run(gather_tests())
+
+    passed = sum(1 for ok in results if ok)
+    total = len(results)
+
+    print(f"\n📊 Results: {passed}/{total} tests passed")
+
     if passed == total:
         print("✅ All API tests passed! Ready for deployment.")
         return 0
@@ -98,4 +99,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    exit(main())
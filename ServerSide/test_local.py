@@ -7,10 +7,13 @@ import requests
 import json
 import sys
 
+# Keep-alive session so looped polls reuse one TCP connection
+_SESSION = requests.Session()
+
 def test_health_endpoint():
     """Test the health endpoint"""
     try:
-        response = requests.get("http://localhost:8000/health", timeout=10)
+        response = _SESSION.get("http://localhost:8000/health", timeout=10)
         if response.status_code == 200:
             print("✅ Health endpoint working!")
             print(f"Response: {response.json()}")
@@ -42,23 +42,43 @@ def process_page(page):
         print(f"Error processing page: {e}")
         return ""
 
+def _extract_doc(doc):
+    """
+    Run the per-page extraction pipeline over an open fitz document
+    """
+    max_threads = min(os.cpu_count() or 4, 4)  # Limit threads for stability
+
+    with ThreadPoolExecutor(max_workers=max_threads) as executor:
+        results = executor.map(process_page, [doc[i] for i in range(len(doc))])
+
+    return "\n".join(results)
+
 def extract_text_fast(pdf_path):
     """
     Extract text from PDF while excluding tables and boxed content
     """
     try:
         doc = fitz.open(pdf_path)
-        max_threads = min(os.cpu_count() or 4, 4)  # Limit threads for stability
-        
-        with ThreadPoolExecutor(max_workers=max_threads) as executor:
-            results = executor.map(process_page, [doc[i] for i in range(len(doc))])
-        
+        text = _extract_doc(doc)
         doc.close()
-        return "\n".join(results)
+        return text
     except Exception as e:
         print(f"Error extracting text from {pdf_path}: {e}")
         return ""
 
+def extract_text_fast_bytes(data):
+    """
+    Extract text from an in-memory PDF without writing it to disk
+    """
+    try:
+        doc = fitz.open(stream=data, filetype="pdf")
+        text = _extract_doc(doc)
+        doc.close()
+        return text
+    except Exception as e:
+        print(f"Error extracting text from PDF bytes: {e}")
+        return ""
+
 def extract_text_with_pages(pdf_path):
     """
     Extract text from PDF with page information